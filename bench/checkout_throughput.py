@@ -0,0 +1,131 @@
+"""Concurrent checkout throughput with and without the SQLite tuning.
+
+Runs the same workload twice against scratch databases: writer processes
+placing checkouts while reader processes browse the storefront. The
+"baseline" profile uses SQLite's defaults (rollback journal, synchronous=FULL,
+2 MB page cache); "tuned" uses the app defaults (WAL, synchronous=NORMAL,
+busy_timeout, 20 MB cache):
+
+    python bench/checkout_throughput.py --writers 4 --readers 4 --seconds 10
+
+Point DATABASE_URL at a scratch PostgreSQL database to measure it instead; the
+SQLite profiles are skipped then.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROFILES = {
+    'baseline': {'SQLITE_JOURNAL_MODE': 'delete', 'SQLITE_SYNCHRONOUS': 'full',
+                 'SQLITE_BUSY_TIMEOUT': '5000', 'SQLITE_CACHE_SIZE': '-2000'},
+    'tuned': {},
+}
+
+
+def writer(args):
+    worker, deadline, product_ids = args
+    from app import app
+
+    client = app.test_client()
+    placed = errors = 0
+    while time.time() < deadline:
+        for product_id in product_ids:
+            client.get(f'/add_to_cart/{product_id}')
+        try:
+            response = client.post('/checkout', data={
+                'name': f'bench {worker}', 'phone': '0100000000', 'address': 'bench'})
+        except Exception:
+            errors += 1
+            continue
+        if response.status_code == 302 and '/order_success/' in response.location:
+            placed += 1
+        else:
+            errors += 1
+    return 'orders', placed, errors
+
+
+def reader(args):
+    worker, deadline, product_ids = args
+    from app import app
+
+    client = app.test_client()
+    client.get(f'/add_to_cart/{product_ids[0]}')  # a session, so pages skip the anonymous cache
+    pages = errors = 0
+    while time.time() < deadline:
+        try:
+            response = client.get(f'/product/{product_ids[pages % len(product_ids)]}')
+        except Exception:
+            errors += 1
+            continue
+        if response.status_code == 200:
+            pages += 1
+        else:
+            errors += 1
+    return 'pages', pages, errors
+
+
+def run_profile(options):
+    """Run one profile in this process; DATABASE_URL and SQLITE_* are already set."""
+    sys.path.insert(0, ROOT)
+    from app import app, db, init_db, Product
+
+    init_db()
+    with app.app_context():
+        products = Product.query.order_by(Product.id).limit(2).all()
+        for product in products:
+            product.stock = 10 ** 9
+        db.session.commit()
+        product_ids = [product.id for product in products]
+        db.engine.dispose()
+
+    deadline = time.time() + options.seconds
+    jobs = [(writer, (i, deadline, product_ids)) for i in range(options.writers)]
+    jobs += [(reader, (i, deadline, product_ids)) for i in range(options.readers)]
+    totals = {'orders': 0, 'pages': 0, 'errors': 0}
+    with multiprocessing.get_context('fork').Pool(len(jobs)) as pool:
+        results = [pool.apply_async(function, (args,)) for function, args in jobs]
+        for result in results:
+            kind, done, errors = result.get()
+            totals[kind] += done
+            totals['errors'] += errors
+    print(json.dumps({key: value / options.seconds if key != 'errors' else value
+                      for key, value in totals.items()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--profile', choices=PROFILES, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.profile:
+        return run_profile(options)
+
+    server_url = os.environ.get('DATABASE_URL', '')
+    profiles = ['server'] if server_url and not server_url.startswith('sqlite') else list(PROFILES)
+    print(f'{options.writers} writers, {options.readers} readers, {options.seconds:g}s per profile')
+    print(f'{"profile":<10} {"orders/s":>10} {"pages/s":>10} {"errors":>8}')
+    for profile in profiles:
+        env = dict(os.environ, CACHE_URL='none://', **PROFILES.get(profile, {}))
+        if profile != 'server':
+            env['DATABASE_URL'] = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "bench.db")}'
+        output = subprocess.run(
+            [sys.executable, __file__, '--profile', profile if profile != 'server' else 'tuned',
+             '--writers', str(options.writers), '--readers', str(options.readers),
+             '--seconds', str(options.seconds)],
+            env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f'{profile:<10} {result["orders"]:>10.1f} {result["pages"]:>10.1f} {result["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
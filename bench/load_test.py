@@ -0,0 +1,204 @@
+"""Storefront load test: latency percentiles, throughput and queries per request.
+
+Drives the WSGI app in worker processes against a catalog made by
+bench/seed_catalog.py. Each worker loops over the scenarios (weighted) until
+the time is up; SQL statements are counted from the Server-Timing header:
+
+    python bench/seed_catalog.py --size 1k
+    python bench/load_test.py --database /tmp/store-bench-1000.db --workers 4 --seconds 20
+
+--save-baseline writes the results to the baseline file; later runs compare
+against it and exit non-zero when a scenario's p95 grows by more than
+--tolerance or it issues more queries per request than the baseline.
+Latency baselines are machine specific, so record them on the machine that
+runs the comparison.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, 'bench', 'baseline.json')
+SEARCH_TERMS = ['دمية', 'سيارة', 'مكعبات', 'ملونة', 'روبوت', 'كرة صغيرة', 'قطار خشبية']
+QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def scenario_index(client, rng, products):
+    return [client.get('/')]
+
+
+def scenario_browse(client, rng, products):
+    """A signed-in style visitor: a session skips the anonymous page cache."""
+    return [client.get('/?sort=' + rng.choice(['newest', 'price_asc', 'best_selling', 'top_rated']))]
+
+
+def scenario_product_detail(client, rng, products):
+    return [client.get(f'/product/{rng.randint(1, products)}')]
+
+
+def scenario_search(client, rng, products):
+    return [client.get('/api/products', query_string={'search': rng.choice(SEARCH_TERMS)})]
+
+
+def scenario_cart(client, rng, products):
+    return [client.get(f'/add_to_cart/{rng.randint(1, products)}'), client.get('/cart')]
+
+
+def scenario_checkout(client, rng, products):
+    responses = [client.get(f'/add_to_cart/{rng.randint(1, products)}')]
+    responses.append(client.post('/checkout', data={
+        'name': 'bench', 'phone': '01000000000', 'address': 'bench'}))
+    return responses
+
+
+SCENARIOS = {
+    'index': (scenario_index, 4),
+    'browse': (scenario_browse, 3),
+    'product_detail': (scenario_product_detail, 6),
+    'search': (scenario_search, 3),
+    'cart': (scenario_cart, 2),
+    'checkout': (scenario_checkout, 1),
+}
+
+
+def query_count(response):
+    match = QUERIES.search(response.headers.get('Server-Timing', ''))
+    return int(match.group(1)) if match else 0
+
+
+def worker(args):
+    worker_id, deadline, products, scenarios = args
+    from app import app
+
+    rng = random.Random(worker_id)
+    anonymous = app.test_client()
+    client = app.test_client()
+    client.get('/add_to_cart/1')
+    client.get('/remove_from_cart/1')
+    names = list(scenarios)
+    weights = [SCENARIOS[name][1] for name in names]
+    samples = {name: [] for name in names}
+    while time.time() < deadline:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        responses = SCENARIOS[name][0](anonymous if name == 'index' else client, rng, products)
+        elapsed = time.perf_counter() - started
+        queries = sum(query_count(response) for response in responses)
+        errors = sum(r.status_code >= 500 for r in responses)
+        samples[name].append((elapsed, queries, errors))
+    return samples
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0
+
+
+def summarize(samples, seconds):
+    results = {}
+    for name, runs in samples.items():
+        if not runs:
+            continue
+        latencies = [elapsed * 1000 for elapsed, _, _ in runs]
+        results[name] = {
+            'requests': len(runs),
+            'throughput': round(len(runs) / seconds, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'queries': round(sum(queries for _, queries, _ in runs) / len(runs), 2),
+            'errors': sum(errors for _, _, errors in runs),
+        }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result['p95_ms'] > expected['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']} ms, baseline {expected['p95_ms']} ms")
+        # Averages move a little with the random mix of products, hence the slack
+        if result['queries'] > expected['queries'] * 1.1 + 0.5:
+            regressions.append(f"{name}: {result['queries']} queries/request, baseline {expected['queries']}")
+        if result['errors']:
+            regressions.append(f"{name}: {result['errors']} server errors")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database', required=True, help='catalog made by bench/seed_catalog.py')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='repeat to pick several')
+    parser.add_argument('--cache', default='memory://', help='CACHE_URL for the run')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed p95 growth (0.5 = +50%%)')
+    options = parser.parse_args()
+
+    # Checkouts change stock and orders; run on a copy so every run starts from the same catalog
+    # The backup API also picks up changes still in the source's -wal file
+    scratch = os.path.join(tempfile.mkdtemp(), 'load.db')
+    with sqlite3.connect(options.database) as source, sqlite3.connect(scratch) as target:
+        source.backup(target)
+    os.environ['DATABASE_URL'] = f'sqlite:///{scratch}'
+    os.environ['CACHE_URL'] = options.cache
+    os.environ.setdefault('SLOW_QUERY_MS', '60000')
+    os.environ.setdefault('SLOW_REQUEST_MS', '60000')
+    sys.path.insert(0, ROOT)
+    from app import app, db, Product
+
+    with app.app_context():
+        products = db.session.query(db.func.max(Product.id)).scalar() or 0
+        db.engine.dispose()
+    if not products:
+        sys.exit(f'{options.database} has no products; run bench/seed_catalog.py first')
+
+    scenarios = options.scenario or list(SCENARIOS)
+    deadline = time.time() + options.seconds
+    jobs = [(i, deadline, products, scenarios) for i in range(options.workers)]
+    with multiprocessing.get_context('fork').Pool(options.workers) as pool:
+        samples = {name: [] for name in scenarios}
+        for worker_samples in pool.map(worker, jobs):
+            for name, runs in worker_samples.items():
+                samples[name].extend(runs)
+    results = summarize(samples, options.seconds)
+
+    print(f'{products} products, {options.workers} workers, {options.seconds:g}s, cache {options.cache}')
+    print(f'{"scenario":<16} {"requests":>9} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"queries":>8} {"errors":>7}')
+    for name, r in results.items():
+        print(f'{name:<16} {r["requests"]:>9} {r["throughput"]:>8} {r["p50_ms"]:>8} {r["p95_ms"]:>8} '
+              f'{r["p99_ms"]:>8} {r["queries"]:>8} {r["errors"]:>7}')
+    shutil.rmtree(os.path.dirname(scratch), ignore_errors=True)
+
+    if options.save_baseline:
+        run = {'products': products, 'workers': options.workers, 'seconds': options.seconds,
+               'cache': options.cache}
+        with open(options.baseline, 'w') as f:
+            json.dump(dict(results, _run=run), f, indent=2, ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {options.baseline}')
+    elif os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            regressions = compare(results, json.load(f), options.tolerance)
+        for regression in regressions:
+            print('REGRESSION:', regression)
+        if regressions:
+            sys.exit(1)
+        print(f'OK: within {options.tolerance:.0%} of {os.path.relpath(options.baseline)}')
+
+
+if __name__ == '__main__':
+    main()
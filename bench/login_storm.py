@@ -0,0 +1,170 @@
+"""Storefront latency during a login storm.
+
+Serves the app from a threaded WSGI server (one web process, like the gthread
+gunicorn worker in instance/procfile) on a scratch database and measures
+product page latency twice: quiet, then while storm threads POST wrong
+passwords for real accounts to /login as fast as they can. The numbers only
+hold for threaded workers: under sync workers a request waiting on the
+hashing pool still ties up its whole worker. Three profiles are compared:
+
+    inline     hashing in the request thread, no throttling (the old behaviour)
+    pool       hashing in the PASSWORD_WORKERS pool, no throttling
+    throttled  the app defaults: pool plus the per-IP/per-account limits
+
+    python bench/login_storm.py --storm 8 --readers 2 --seconds 10
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACCOUNTS = 100
+
+UNTHROTTLED = {'LOGIN_ATTEMPTS_PER_IP': '1000000', 'LOGIN_ATTEMPTS_PER_ACCOUNT': '1000000'}
+PROFILES = {
+    'inline': dict(UNTHROTTLED, PASSWORD_WORKERS='0'),
+    'pool': UNTHROTTLED,
+    'throttled': {},
+}
+
+
+def serve(port):
+    """Run in the server subprocess: seed the scratch database, then serve until killed."""
+    sys.path.insert(0, ROOT)
+    from werkzeug.security import generate_password_hash
+    from werkzeug.serving import make_server
+    from app import app, db, init_db, User
+
+    init_db()
+    with app.app_context():
+        password = generate_password_hash('storm-password', app.config['PASSWORD_HASH_METHOD'])
+        db.session.add_all(User(name=f'عميل {i}', email=f'storm{i}@bench.test', phone='0100', password=password)
+                           for i in range(ACCOUNTS))
+        db.session.commit()
+        db.engine.dispose()
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(base, process, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            sys.exit('the server exited before it came up')
+        try:
+            urllib.request.urlopen(base + '/', timeout=5).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    sys.exit('the server did not come up')
+
+
+def status_of(request):
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as error:
+        return error.code
+
+
+def reader(base, products, deadline, latencies):
+    i = 0
+    while time.time() < deadline:
+        started = time.perf_counter()
+        status_of(f'{base}/product/{i % products + 1}')
+        latencies.append(time.perf_counter() - started)
+        i += 1
+
+
+def stormer(base, worker, deadline, statuses):
+    i = worker
+    while time.time() < deadline:
+        data = urllib.parse.urlencode({'email': f'storm{i % ACCOUNTS}@bench.test', 'password': 'wrong'}).encode()
+        statuses.append(status_of(urllib.request.Request(base + '/login', data=data)))
+        i += 1
+
+
+def run_phase(base, products, options, storm):
+    latencies, statuses = [], []
+    deadline = time.time() + options.seconds
+    threads = [threading.Thread(target=reader, args=(base, products, deadline, latencies))
+               for _ in range(options.readers)]
+    if storm:
+        threads += [threading.Thread(target=stormer, args=(base, i, deadline, statuses))
+                    for i in range(options.storm)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses
+
+
+def percentile_ms(values, fraction):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(fraction * len(values)))] * 1000, 1) if values else 0
+
+
+def run_profile(name, options):
+    port = free_port()
+    env = dict(os.environ, **PROFILES[name])
+    env['DATABASE_URL'] = f'sqlite:///{os.path.join(tempfile.mkdtemp(), "storm.db")}'
+    env.setdefault('CACHE_URL', 'none://')  # pages do their real work, as for signed-in visitors
+    env.setdefault('SLOW_REQUEST_MS', '60000')
+    process = subprocess.Popen([sys.executable, __file__, '--serve', str(port)], env=env, cwd=ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_up(base, process)
+        products = options.products
+        quiet, _ = run_phase(base, products, options, storm=False)
+        stormy, statuses = run_phase(base, products, options, storm=True)
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        'quiet_p50_ms': percentile_ms(quiet, 0.50), 'quiet_p95_ms': percentile_ms(quiet, 0.95),
+        'storm_p50_ms': percentile_ms(stormy, 0.50), 'storm_p95_ms': percentile_ms(stormy, 0.95),
+        'checked': round(sum(status == 200 for status in statuses) / options.seconds, 1),
+        'throttled': sum(status == 429 for status in statuses),
+        'busy': sum(status == 503 for status in statuses),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--storm', type=int, default=8, help='threads posting logins')
+    parser.add_argument('--readers', type=int, default=2, help='threads browsing product pages')
+    parser.add_argument('--seconds', type=float, default=10, help='per phase')
+    parser.add_argument('--products', type=int, default=3, help='product ids the readers cycle through')
+    parser.add_argument('--profile', action='append', choices=PROFILES, help='repeat to pick several')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.serve:
+        return serve(options.serve)
+
+    print(f'{options.storm} storm threads, {options.readers} readers, {options.seconds:g}s per phase')
+    print(f'{"profile":<10} {"quiet p50":>10} {"quiet p95":>10} {"storm p50":>10} {"storm p95":>10} '
+          f'{"checks/s":>9} {"429s":>7} {"503s":>7}')
+    for name in options.profile or list(PROFILES):
+        r = run_profile(name, options)
+        print(f'{name:<10} {r["quiet_p50_ms"]:>10} {r["quiet_p95_ms"]:>10} {r["storm_p50_ms"]:>10} '
+              f'{r["storm_p95_ms"]:>10} {r["checked"]:>9} {r["throttled"]:>7} {r["busy"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
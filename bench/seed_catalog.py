@@ -0,0 +1,168 @@
+"""Seed a database with a synthetic catalog for benchmarks.
+
+Products, users, orders (with line items) and reviews are generated from a
+fixed random seed, bulk-inserted through SQLAlchemy Core, and then the
+search index, rating aggregates and sales rollups are rebuilt once:
+
+    python bench/seed_catalog.py --products 10000 --orders 1000000 --reviews 1000000
+
+The database defaults to a scratch file named after the catalog size; pass
+--database instance/store.db to seed the app's own database instead.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000}
+CATEGORIES = ['دمى', 'سيارات', 'تعليمية', 'خارجية', 'فنية', 'رياضية', 'ألغاز', 'إلكترونية']
+NOUNS = ['دمية', 'سيارة', 'مكعبات', 'طائرة', 'دفتر', 'كرة', 'قطار', 'روبوت', 'لغز', 'مطبخ', 'بيت', 'دراجة']
+ADJECTIVES = ['صغيرة', 'كبيرة', 'ملونة', 'خشبية', 'ذكية', 'سريعة', 'ناطقة', 'مضيئة', 'تعليمية', 'كلاسيكية']
+STATUSES = ['delivered'] * 6 + ['shipped'] * 2 + ['pending', 'processing', 'cancelled']
+BATCH_SIZE = 20000
+
+
+def default_database(products):
+    return os.path.join(tempfile.gettempdir(), f'store-bench-{products}.db')
+
+
+def insert_batches(connection, table, rows):
+    """Insert an iterable of dicts into table, BATCH_SIZE rows per executemany."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            connection.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        connection.execute(table.insert(), batch)
+
+
+def seed(products, users, orders, reviews, random_seed=1):
+    from sqlalchemy import bindparam, text
+    from werkzeug.security import generate_password_hash
+    from app import app, db, Product, User, Order, OrderItem, Review
+    from app import migrate_db, rebuild_search_index, reconcile_ratings, rebuild_sales_rollup
+
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+    with app.app_context():
+        migrate_db()
+        if Product.query.count():
+            sys.exit(f'{db.engine.url.database} already has products; seed an empty database')
+        started = time.time()
+        prices = [round(rng.uniform(20, 1500), 2) for _ in range(products)]
+        # Product inserts bypass the ORM, so the search index is rebuilt once at the end
+        with db.engine.begin() as conn:
+            insert_batches(conn, Product.__table__, ({
+                'sku': f'BENCH-{i:07d}',
+                'name': f'{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {i}',
+                'description': f'{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} للأطفال',
+                'price': prices[i - 1],
+                'cost': round(prices[i - 1] * rng.uniform(0.4, 0.8), 2),
+                'image': f'https://picsum.photos/seed/{i}/400',
+                'category': rng.choice(CATEGORIES),
+                'stock': rng.randint(0, 500),
+                'featured': rng.random() < 0.01,
+                'sales_count': 0,
+                'rating_sum': 0,
+                'rating_count': 0,
+            } for i in range(1, products + 1)))
+
+            password = generate_password_hash('bench-password')
+            insert_batches(conn, User.__table__, ({
+                'name': f'عميل {i}',
+                'email': f'customer{i}@bench.test',
+                'phone': f'010{i:08d}',
+                'password': password,
+                'created_at': now - timedelta(days=rng.randint(0, 730)),
+                'is_active': True,
+            } for i in range(1, users + 1)))
+        print(f'{products} products, {users} users in {time.time() - started:.1f}s')
+
+        started = time.time()
+        sales = [0] * (products + 1)
+        for first in range(1, orders + 1, BATCH_SIZE):
+            order_rows, item_rows = [], []
+            for order_id in range(first, min(first + BATCH_SIZE, orders + 1)):
+                total = cost_total = 0
+                for _ in range(rng.randint(1, 3)):
+                    product_id = rng.randint(1, products)
+                    quantity = rng.randint(1, 3)
+                    price = prices[product_id - 1]
+                    unit_cost = round(price * 0.6, 2)
+                    item_rows.append({'order_id': order_id, 'product_id': product_id,
+                                      'name': f'منتج {product_id}', 'quantity': quantity,
+                                      'unit_price': price, 'unit_cost': unit_cost})
+                    total += price * quantity
+                    cost_total += unit_cost * quantity
+                    sales[product_id] += quantity
+                user_id = rng.randint(1, users) if rng.random() < 0.8 else None
+                order_rows.append({
+                    'id': order_id, 'user_id': user_id, 'customer_name': f'عميل {user_id or order_id}',
+                    'phone': '01000000000', 'email': None, 'address': 'القاهرة', 'items': '[]',
+                    'total': round(total, 2), 'cost_total': round(cost_total, 2),
+                    'status': rng.choice(STATUSES),
+                    'date': now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+                })
+            with db.engine.begin() as conn:
+                conn.execute(Order.__table__.insert(), order_rows)
+                conn.execute(OrderItem.__table__.insert(), item_rows)
+        with db.engine.begin() as conn:
+            product = Product.__table__
+            conn.execute(product.update().where(product.c.id == bindparam('pid'))
+                         .values(sales_count=bindparam('sold')),
+                         [{'pid': i, 'sold': sold} for i, sold in enumerate(sales) if i and sold])
+        print(f'{orders} orders in {time.time() - started:.1f}s')
+
+        started = time.time()
+        with db.engine.begin() as conn:
+            insert_batches(conn, Review.__table__, ({
+                'product_id': rng.randint(1, products),
+                'user_id': rng.randint(1, users),
+                'rating': rng.choice([1, 2, 3, 4, 4, 5, 5, 5]),
+                'comment': 'منتج رائع' if rng.random() < 0.7 else 'مقبول',
+                'date': now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)),
+            } for _ in range(reviews)))
+        print(f'{reviews} reviews in {time.time() - started:.1f}s')
+
+        started = time.time()
+        rebuild_search_index()
+        reconcile_ratings()
+        rebuild_sales_rollup()
+        if db.engine.dialect.name == 'sqlite':
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+        print(f'search index, ratings and rollups rebuilt in {time.time() - started:.1f}s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', choices=SIZES, help='preset catalog size (sets --products)')
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--users', type=int, help='default: one per 20 orders, at least 100')
+    parser.add_argument('--orders', type=int, default=20000)
+    parser.add_argument('--reviews', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--database', help='SQLite file to seed (default: a scratch file per size)')
+    options = parser.parse_args()
+    if options.size:
+        options.products = SIZES[options.size]
+
+    database = options.database or default_database(options.products)
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(database)}'
+    os.environ.setdefault('CACHE_URL', 'none://')
+    os.environ.setdefault('SLOW_QUERY_MS', '60000')  # bulk inserts are slow by design
+    sys.path.insert(0, ROOT)
+    seed(options.products, options.users or max(100, options.orders // 20),
+         options.orders, options.reviews, options.seed)
+    print(f'Seeded {database}')
+
+
+if __name__ == '__main__':
+    main()
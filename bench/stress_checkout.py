@@ -0,0 +1,95 @@
+"""Concurrency stress test for checkout stock reservation.
+
+Runs many checkouts of the same products in parallel processes against a
+scratch SQLite database and checks that no stock update was lost:
+
+    python bench/stress_checkout.py --workers 8 --checkouts 50 --stock 120
+
+Exits non-zero if stock oversold or the orders don't add up.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def checkout_worker(args):
+    worker, checkouts, product_ids = args
+    from app import app
+
+    placed = 0
+    client = app.test_client()
+    for i in range(checkouts):
+        for product_id in product_ids:
+            client.get(f'/add_to_cart/{product_id}')
+        response = client.post('/checkout', data={
+            'name': f'stress {worker}-{i}',
+            'phone': '0100000000',
+            'address': 'stress test',
+        })
+        if response.status_code == 302 and '/order_success/' in response.location:
+            placed += 1
+        else:
+            # Rejected checkouts keep the cart; start the next attempt empty
+            for product_id in product_ids:
+                client.get(f'/remove_from_cart/{product_id}')
+    return placed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--checkouts', type=int, default=50, help='checkouts per worker')
+    parser.add_argument('--stock', type=int, default=120, help='starting stock of each product')
+    parser.add_argument('--products', type=int, default=2, help='products in every cart')
+    options = parser.parse_args()
+
+    database = os.path.join(tempfile.mkdtemp(), 'stress.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    os.environ['CACHE_URL'] = 'none://'
+    sys.path.insert(0, ROOT)
+    from app import app, db, init_db, Product, Order, OrderItem
+
+    init_db()
+    with app.app_context():
+        products = Product.query.order_by(Product.id).limit(options.products).all()
+        for product in products:
+            product.stock = options.stock
+            product.sales_count = 0
+        db.session.commit()
+        product_ids = [product.id for product in products]
+        db.engine.dispose()
+
+    jobs = [(worker, options.checkouts, product_ids) for worker in range(options.workers)]
+    with multiprocessing.get_context('fork').Pool(options.workers) as pool:
+        placed = sum(pool.map(checkout_worker, jobs))
+
+    failures = []
+    with app.app_context():
+        expected = min(options.stock, options.workers * options.checkouts)
+        if placed != expected:
+            failures.append(f'{placed} checkouts succeeded, expected {expected}')
+        if Order.query.count() != placed:
+            failures.append(f'{Order.query.count()} orders stored for {placed} successful checkouts')
+        for product in Product.query.filter(Product.id.in_(product_ids)):
+            sold = db.session.query(db.func.coalesce(db.func.sum(OrderItem.quantity), 0)) \
+                .filter(OrderItem.product_id == product.id).scalar()
+            if product.stock < 0:
+                failures.append(f'product {product.id} oversold: stock {product.stock}')
+            if product.stock + sold != options.stock or product.sales_count != sold:
+                failures.append(f'product {product.id}: stock {product.stock}, sales_count '
+                                f'{product.sales_count}, {sold} units in orders (started with {options.stock})')
+
+    print(f'{options.workers} workers x {options.checkouts} checkouts: {placed} orders placed')
+    for failure in failures:
+        print('FAIL:', failure)
+    if failures:
+        sys.exit(1)
+    print('OK: no lost updates, no overselling')
+
+
+if __name__ == '__main__':
+    main()